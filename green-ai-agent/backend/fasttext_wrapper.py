@@ -1,6 +1,6 @@
 """
 Light wrapper to use a FastText supervised model for classification.
-It tries to use the Python `fasttext` module. If not available, it will try to call the `fasttext` CLI via subprocess (predict). If no model is found, it raises a clear error.
+It tries to use the Python `fasttext` module. If not available, it will keep a `fasttext predict-prob` CLI process running and feed it requests over stdin. If no model is found, it raises a clear error.
 
 Function:
  - load_model(path)
@@ -22,10 +22,12 @@ The returned dict shape matches the minimal fields used by the API/dashboard:
 
 """
 from __future__ import annotations
+import atexit
 import shutil
 import time
 import json
 import subprocess
+import threading
 from typing import List, Dict, Any, Optional
 
 try:
@@ -34,14 +36,75 @@ try:
 except Exception:
     HAS_PY_FASTTEXT = False
 
+try:
+    from cachetools import LFUCache
+    HAS_CACHETOOLS = True
+except Exception:
+    HAS_CACHETOOLS = False
+
 MODEL = None
 MODEL_PATH = None
 MODEL_TYPE = 'fasttext'
+_MODEL_USED = ''
+
+# fixed per-model estimates, copied into each result
+_CO2_G = 0.0005  # tiny estimate in grams
+_ENV_IMPACT = {'co2_this_classification': _CO2_G, 'impact_level': 'very_low'}
+
+# top-k (label, prob) pairs keyed by (hash(text), k); the hash avoids holding email bodies
+CACHE_SIZE = 50_000
+_CACHE = LFUCache(maxsize=CACHE_SIZE) if HAS_CACHETOOLS else None
+_CACHE_LOCK = threading.Lock()
+
+# long-lived `fasttext predict-prob MODEL - -1` process used when the python module is missing;
+# it always reports every label (-1) and callers slice their top k, so differing k never restarts it
+_CLI_PROC: Optional[subprocess.Popen] = None
+_CLI_LOCK = threading.Lock()
+
+
+def _start_cli():
+    global _CLI_PROC
+    _stop_cli()
+    # '-' makes fasttext read one request per line from stdin
+    cmd = ['fasttext', 'predict-prob', MODEL_PATH, '-', '-1']
+    _CLI_PROC = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        encoding='utf-8', bufsize=1,
+    )
+
+
+def _stop_cli():
+    global _CLI_PROC
+    if _CLI_PROC is not None:
+        try:
+            _CLI_PROC.stdin.close()
+            _CLI_PROC.terminate()
+            _CLI_PROC.wait(timeout=1)
+        except Exception:
+            pass
+    _CLI_PROC = None
+
+
+# don't leave the fasttext worker behind when the interpreter exits
+atexit.register(_stop_cli)
+
+
+def _cli_roundtrip(line: str) -> str:
+    _CLI_PROC.stdin.write(line)
+    _CLI_PROC.stdin.flush()
+    out = _CLI_PROC.stdout.readline()
+    if not out:
+        raise BrokenPipeError('fasttext CLI exited unexpectedly')
+    return out
 
 
 def load_model(path: str):
-    global MODEL, MODEL_PATH
+    global MODEL, MODEL_PATH, _MODEL_USED
     MODEL_PATH = path
+    _MODEL_USED = f'fasttext({path})'
+    if _CACHE is not None:
+        with _CACHE_LOCK:
+            _CACHE.clear()
     if HAS_PY_FASTTEXT:
         MODEL = fasttext.load_model(path)
     else:
@@ -51,6 +114,8 @@ def load_model(path: str):
         if not path:
             raise RuntimeError('No model path provided')
         MODEL = None
+        with _CLI_LOCK:
+            _start_cli()
     return MODEL
 
 
@@ -66,32 +131,27 @@ def _predict_py(text: str, k: int = 3):
 
 
 def _predict_cli(text: str, k: int = 3):
-    # write text to a temp file and call fasttext predict-prob
-    import tempfile
-    with tempfile.NamedTemporaryFile('w', encoding='utf-8', delete=False) as tf:
-        tf.write(text.replace('\n',' '))
-        tmpname = tf.name
-    # fasttext predict-prob model.bin tmp.txt k
-    cmd = ['fasttext', 'predict-prob', MODEL_PATH, tmpname, str(k)]
-    try:
-        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, encoding='utf-8')
-        # output: label prob label prob ... for each line
-        parts = out.strip().split()
-        pairs = []
-        # each label prob per line, but for single line we parse sequentially
-        i = 0
-        while i < len(parts):
-            lbl = parts[i]
-            pr = float(parts[i+1])
-            pairs.append((lbl.replace('__label__',''), pr))
-            i += 2
-        return pairs
-    finally:
+    # one line in, one line out on the persistent fasttext process
+    line = text.replace('\r', ' ').replace('\n', ' ') + '\n'
+    with _CLI_LOCK:
+        if _CLI_PROC is None or _CLI_PROC.poll() is not None:
+            _start_cli()
         try:
-            import os
-            os.unlink(tmpname)
-        except Exception:
-            pass
+            out = _cli_roundtrip(line)
+        except OSError:
+            # worker died mid-request: restart it once and retry
+            _start_cli()
+            out = _cli_roundtrip(line)
+    # output: label prob label prob ..., most likely first
+    parts = out.strip().split()
+    pairs = []
+    i = 0
+    while i + 1 < len(parts):
+        lbl = parts[i]
+        pr = float(parts[i+1])
+        pairs.append((lbl.replace('__label__',''), pr))
+        i += 2
+    return pairs if k < 0 else pairs[:k]
 
 
 def classify(text: str, k: int = 3) -> Dict[str, Any]:
@@ -100,13 +160,22 @@ def classify(text: str, k: int = 3) -> Dict[str, Any]:
         raise RuntimeError('Model not loaded. Call load_model(path) first.')
 
     start = time.time()
-    try:
-        if HAS_PY_FASTTEXT and MODEL is not None:
-            preds = _predict_py(text, k=k)
-        else:
-            preds = _predict_cli(text, k=k)
-    except Exception as e:
-        raise RuntimeError(f'FastText prediction failed: {e}')
+    key = (hash(text), k)
+    preds = None
+    if _CACHE is not None:
+        with _CACHE_LOCK:
+            preds = _CACHE.get(key)
+    if preds is None:
+        try:
+            if HAS_PY_FASTTEXT and MODEL is not None:
+                preds = tuple(_predict_py(text, k=k))
+            else:
+                preds = tuple(_predict_cli(text, k=k))
+        except Exception as e:
+            raise RuntimeError(f'FastText prediction failed: {e}')
+        if _CACHE is not None:
+            with _CACHE_LOCK:
+                _CACHE[key] = preds
 
     # build results
     if preds:
@@ -117,26 +186,21 @@ def classify(text: str, k: int = 3) -> Dict[str, Any]:
     all_predictions = [{'category': p[0], 'confidence': float(p[1])} for p in preds]
 
     elapsed = time.time() - start
-    # small estimated energy metrics for a cheap model
-    co2_g = 0.0005  # tiny estimate in grams
 
     result = {
         'predicted_category': predicted_category,
         'confidence': float(confidence),
         'all_predictions': all_predictions,
-        'model_used': f'fasttext({MODEL_PATH})',
+        'model_used': _MODEL_USED,
         'escalated': False,
         'escalation_attempted': False,
         'energy_metrics': {
-            'co2_emissions_g': co2_g,
+            'co2_emissions_g': _CO2_G,
             'processing_time_seconds': round(elapsed, 6),
-            'energy_efficiency_score': round(co2_g / max(elapsed, 1e-6), 6),
+            'energy_efficiency_score': round(_CO2_G / max(elapsed, 1e-6), 6),
         },
         'ai_insights': {
-            'environmental_impact': {
-                'co2_this_classification': co2_g,
-                'impact_level': 'very_low'
-            },
+            'environmental_impact': _ENV_IMPACT.copy(),
             'accuracy_assessment': {
                 'confidence_level': 'high' if confidence >= 0.85 else ('medium' if confidence >= 0.7 else 'low'),
                 'should_review': confidence < 0.7
@@ -13,6 +13,15 @@ from backend.config import DB_PATH, EMAIL_CATEGORIES
 
 from backend.config_prod import MAX_EMAIL_LENGTH  # NEW (or from backend.config if you move it there)
 
+# orjson encodes responses several times faster than the stdlib json encoder
+# (ORJSONResponse is the fast path under the pinned fastapi==0.115.0; newer FastAPI,
+# e.g. 0.143, deprecates it with a warning and serializes fast natively, so revisit on upgrade)
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except Exception:
+    from fastapi.responses import JSONResponse as DefaultResponse
+
 # Initialize components with error handling
 orchestrator = None
 sklearn_model = None
@@ -26,19 +35,23 @@ try:
 except Exception as e:
     print(f"Warning: Could not initialize orchestrator: {e}")
 
-try:
-    from backend.models import get_sklearn_model
-    sklearn_model = get_sklearn_model()
-    SKLEARN_READY = bool(sklearn_model)
-    if not SKLEARN_READY:
-        print("Warning: Sklearn model not found - will use orchestrator/fallback")
-except Exception as e:
-    print(f"Warning: Could not load sklearn model: {e}")
 
-if not ORCHESTRATOR_READY and not SKLEARN_READY:
-    print("Starting in basic mode (keyword fallback only)...")
+def load_models():
+    """Preload the sklearn model (called from the startup hook)."""
+    global sklearn_model, SKLEARN_READY
+    try:
+        from backend.models import preload_models
+        sklearn_model = preload_models().get("sklearn")
+        SKLEARN_READY = bool(sklearn_model)
+        if not SKLEARN_READY:
+            print("Warning: Sklearn model not found - will use orchestrator/fallback")
+    except Exception as e:
+        print(f"Warning: Could not load sklearn model: {e}")
+
+    if not ORCHESTRATOR_READY and not SKLEARN_READY:
+        print("Starting in basic mode (keyword fallback only)...")
 
-app = FastAPI(title="Green AI Email Classification API", version="2.0")
+app = FastAPI(title="Green AI Email Classification API", version="2.0", default_response_class=DefaultResponse)
 
 
 # -------------------------
@@ -596,6 +609,7 @@ init_email_db()
 @app.on_event("startup")
 async def startup_event():
     print("Green AI Email Classification API Starting...")
+    load_models()
     print(f"Orchestrator Ready: {ORCHESTRATOR_READY}")
     if not ORCHESTRATOR_READY:
         print("Running in fallback mode - some features may be limited")
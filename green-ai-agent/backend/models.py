@@ -15,7 +15,9 @@ def get_sklearn_model():
         model_path = Path(SKLEARN_MODEL_PATH)
         if model_path.exists():
             try:
-                _model_cache['sklearn'] = joblib.load(model_path)
+                # mmap numpy arrays (idf_, coef_) read-only: faster cold start,
+                # and worker processes share the same pages
+                _model_cache['sklearn'] = joblib.load(model_path, mmap_mode='r')
             except Exception as e:
                 print(f"Error loading sklearn model: {e}")
                 return None
@@ -24,6 +26,11 @@ def get_sklearn_model():
             return None
     return _model_cache['sklearn']
 
+def preload_models() -> Dict[str, Any]:
+    """Load all available models into the cache so the first request doesn't pay for it."""
+    get_sklearn_model()
+    return dict(_model_cache)
+
 def save_sklearn_model(model: Any) -> bool:
     """Save a scikit-learn model to the models directory."""
     try:
@@ -3,21 +3,48 @@ Wrapper for sklearn TF-IDF + LogisticRegression pipeline saved via joblib.
 Provides load_model(path) and classify(text,k=3) -> dict matching API shape used elsewhere.
 """
 from __future__ import annotations
+import threading
 import time
 import joblib
+import numpy as np
 import os
 from typing import List, Dict, Any
 
+try:
+    from cachetools import LFUCache
+    HAS_CACHETOOLS = True
+except Exception:
+    HAS_CACHETOOLS = False
+
 MODEL = None
 MODEL_PATH = None
+# labels of the final pipeline step, resolved once in load_model
+_CLASSES: tuple = ()
+_MODEL_USED = ''
+
+# fixed per-model estimates, copied into each result
+_CO2_G = 0.001  # small estimate
+_ENV_IMPACT = {'co2_this_classification': _CO2_G, 'impact_level': 'low'}
+
+# ranked (label, prob) pairs keyed by hash(text); the hash avoids holding email bodies
+CACHE_SIZE = 50_000
+_CACHE = LFUCache(maxsize=CACHE_SIZE) if HAS_CACHETOOLS else None
+_CACHE_LOCK = threading.Lock()
 
 
 def load_model(path: str):
-    global MODEL, MODEL_PATH
+    global MODEL, MODEL_PATH, _CLASSES, _MODEL_USED
     if not os.path.exists(path):
         raise FileNotFoundError(f"Model file not found: {path}")
     MODEL = joblib.load(path)
     MODEL_PATH = path
+    _MODEL_USED = f'sklearn({os.path.basename(path)})'
+    # model is a pipeline: vectorizer + classifier
+    clf = MODEL.steps[-1][1]
+    _CLASSES = tuple(clf.classes_)
+    if _CACHE is not None:
+        with _CACHE_LOCK:
+            _CACHE.clear()
     return MODEL
 
 
@@ -26,35 +53,38 @@ def classify(text: str, k: int = 3) -> Dict[str, Any]:
         raise RuntimeError('Model not loaded. Call load_model(path) first.')
 
     start = time.time()
-    # model is a pipeline: vectorizer + classifier
-    clf = MODEL.named_steps[list(MODEL.named_steps.keys())[-1]]
-    classes = list(clf.classes_)
-    probs = MODEL.predict_proba([text])[0]
-    pairs = sorted(zip(classes, probs), key=lambda x: x[1], reverse=True)
-    topk = pairs[:k]
+    key = hash(text)
+    pairs = None
+    if _CACHE is not None:
+        with _CACHE_LOCK:
+            pairs = _CACHE.get(key)
+    if pairs is None:
+        probs = MODEL.predict_proba([text])[0]
+        # stable, so ties keep the classifier's label order as before
+        order = np.argsort(-probs, kind='stable')
+        pairs = tuple((_CLASSES[i], float(probs[i])) for i in order)
+        if _CACHE is not None:
+            with _CACHE_LOCK:
+                _CACHE[key] = pairs
 
-    predicted_category, confidence = topk[0] if topk else ('unknown', 0.0)
+    predicted_category, confidence = pairs[0] if (pairs and k > 0) else ('unknown', 0.0)
 
     elapsed = time.time() - start
-    co2_g = 0.001  # small estimate
 
     result = {
         'predicted_category': predicted_category,
         'confidence': float(confidence),
         'all_predictions': [{'category': p[0], 'confidence': float(p[1])} for p in pairs],
-        'model_used': f'sklearn({os.path.basename(MODEL_PATH)})',
+        'model_used': _MODEL_USED,
         'escalated': False,
         'escalation_attempted': False,
         'energy_metrics': {
-            'co2_emissions_g': co2_g,
+            'co2_emissions_g': _CO2_G,
             'processing_time_seconds': round(elapsed, 6),
-            'energy_efficiency_score': round(co2_g / max(elapsed, 1e-6), 6),
+            'energy_efficiency_score': round(_CO2_G / max(elapsed, 1e-6), 6),
         },
         'ai_insights': {
-            'environmental_impact': {
-                'co2_this_classification': co2_g,
-                'impact_level': 'low'
-            },
+            'environmental_impact': _ENV_IMPACT.copy(),
             'accuracy_assessment': {
                 'confidence_level': 'high' if confidence >= 0.85 else ('medium' if confidence >= 0.7 else 'low'),
                 'should_review': confidence < 0.7
@@ -13,8 +13,12 @@ setup(
         "transformers==4.35.0",
         "datasets==2.14.0",
         "scikit-learn==1.3.2",
+        "cachetools==5.5.0",
         "pandas==2.3.2",
         "numpy==2.1.2",
+        "orjson==3.10.7",
+        "pyahocorasick==2.1.0",
+        "numba==0.61.0",
         "codecarbon==3.0.4",
         "psutil==5.9.6",
         "GPUtil==1.4.0",
@@ -26,5 +30,9 @@ setup(
         "redis==5.0.1",
         "gunicorn==21.2.0",
     ],
-    python_requires=">=3.8",
+    extras_require={
+        # fastest keyword scan in agent_logic; pyahocorasick is used without it
+        "hyperscan": ["hyperscan==0.7.8"],
+    },
+    python_requires=">=3.10",  # numba 0.61 needs 3.10+; matches the python:3.10-slim image
 )
\ No newline at end of file
@@ -0,0 +1,30 @@
+import pytest
+
+import backend.agent_logic as agent_logic
+
+
+def _clear_caches():
+    agent_logic._text_counts.cache_clear()
+    agent_logic._classify_core.cache_clear()
+
+
+@pytest.fixture
+def swap_keywords(monkeypatch):
+    """Return a function that rebuilds every matcher and the trivial table from a new keyword bank."""
+    def swap(keywords):
+        kw_cats = agent_logic._keyword_categories(keywords)
+        monkeypatch.setattr(agent_logic, "KEYWORDS", keywords)
+        monkeypatch.setattr(agent_logic, "_KW_CATS", kw_cats)
+        monkeypatch.setattr(agent_logic, "_KW_LIST", tuple(kw_cats))
+        if agent_logic.HAS_HYPERSCAN:
+            monkeypatch.setattr(agent_logic, "_HS_DB", agent_logic._build_hs_database())
+        if agent_logic.HAS_AHOCORASICK:
+            monkeypatch.setattr(agent_logic, "_AUTOMATON", agent_logic._build_automaton())
+        monkeypatch.setattr(agent_logic, "_scan_unrolled", agent_logic._build_unrolled_scanner())
+        # hit counts per category can now go higher than the module's table covers
+        monkeypatch.setattr(agent_logic, "_TRIVIAL_CORES", agent_logic._build_trivial_cores())
+        _clear_caches()
+
+    yield swap
+    # results scored under the swapped bank must not outlive it
+    _clear_caches()
@@ -0,0 +1,39 @@
+"""Escalation policy around FINAL_CONFIDENCE, which the stock keyword bank can't reach."""
+import pytest
+
+import backend.agent_logic as agent_logic
+
+# ten work keywords: nine hits score ~0.967, eight ~0.947, i.e. either side of FINAL_CONFIDENCE
+WORDS = [f"kw{i}" for i in range(10)]
+
+
+@pytest.fixture
+def agent(swap_keywords):
+    swap_keywords(dict(agent_logic.KEYWORDS, work=WORDS))
+    return agent_logic.IntelligentEmailAgent()
+
+
+def text_with_hits(n):
+    return " ".join(WORDS[:n])
+
+
+def test_hit_counts_straddle_final_confidence(agent):
+    assert agent.classify_email(text_with_hits(9))["confidence"] >= agent_logic.FINAL_CONFIDENCE
+    assert agent.classify_email(text_with_hits(8))["confidence"] < agent_logic.FINAL_CONFIDENCE
+
+
+@pytest.mark.parametrize("prefs", [{"confidence_threshold": 0.99}, {"priority": "accuracy"}], ids=["threshold", "accuracy"])
+def test_final_confidence_skips_escalation(agent, prefs):
+    # below FINAL_CONFIDENCE both preferences try the heavy model ...
+    res = agent.classify_email(text_with_hits(8), prefs)
+    assert res["escalation_attempted"] and not res["escalated"]
+    # ... above it neither does, even with priority == "accuracy"
+    res = agent.classify_email(text_with_hits(9), prefs)
+    assert not res["escalation_attempted"] and not res["escalated"]
+    assert res["model_used"] == "agent_light"
+
+
+def test_batch_applies_the_same_policy(agent):
+    texts = [text_with_hits(8), text_with_hits(9)]
+    results = agent.classify_batch(texts, [{"priority": "accuracy"}] * 2)
+    assert [r["escalation_attempted"] for r in results] == [True, False]
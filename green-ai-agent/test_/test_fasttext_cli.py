@@ -0,0 +1,103 @@
+"""Persistent `fasttext predict-prob` worker, driven through a fake fasttext CLI on PATH."""
+import os
+import stat
+import sys
+
+import pytest
+
+import backend.fasttext_wrapper as ftw
+
+# answers one line per request: the first word of the request is the top label
+# ("carriage-return" if a raw \r got through); logs each start, and exits without
+# answering once the DIE file exists (removing it)
+FAKE_FASTTEXT = '''#!{python}
+import os, sys
+log, die = os.environ["FAKE_FT_LOG"], os.environ["FAKE_FT_DIE"]
+with open(log, "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+# binary, so only "\\n" ends a request (like the real CLI's getline)
+for line in sys.stdin.buffer:
+    if os.path.exists(die):
+        os.remove(die)
+        sys.exit(1)
+    line = line.decode("utf-8")[:-1]
+    top = "carriage-return" if "\\r" in line else (line.split(" ")[0] or "empty")
+    print("__label__%s 0.7 __label__other 0.2 __label__third 0.1" % top, flush=True)
+'''
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    exe = tmp_path / "fasttext"
+    exe.write_text(FAKE_FASTTEXT.format(python=sys.executable))
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    log, die = tmp_path / "starts.log", tmp_path / "die"
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_FT_LOG", str(log))
+    monkeypatch.setenv("FAKE_FT_DIE", str(die))
+    monkeypatch.setattr(ftw, "HAS_PY_FASTTEXT", False)
+    monkeypatch.setattr(ftw, "_CACHE", None)
+    ftw.load_model("model.bin")
+    yield log, die
+    ftw._stop_cli()
+    monkeypatch.setattr(ftw, "MODEL_PATH", None)
+
+
+def starts(log):
+    return log.read_text().splitlines()
+
+
+def test_one_line_in_one_line_out(fake_cli):
+    log, _ = fake_cli
+    for word in ("alpha", "beta", "gamma"):
+        assert ftw.classify(f"{word} rest of the email")["predicted_category"] == word
+    # one worker for every request, asked for all labels
+    assert starts(log) == ["predict-prob model.bin - -1"]
+
+
+def test_varying_k_reuses_worker(fake_cli):
+    log, _ = fake_cli
+    for k in (1, 3, 2, 1):
+        preds = ftw.classify("alpha", k=k)["all_predictions"]
+        assert [p["category"] for p in preds] == ["alpha", "other", "third"][:k]
+    assert len(starts(log)) == 1
+
+
+@pytest.mark.parametrize("sep", ["\n", "\r", "\r\n"])
+def test_line_breaks_stay_in_one_request(fake_cli, sep):
+    assert ftw.classify(f"alpha{sep}beta")["predicted_category"] == "alpha"
+    # a leaked line break would leave an extra answer queued for this request
+    assert ftw.classify("gamma")["predicted_category"] == "gamma"
+
+
+def test_restart_after_worker_exit(fake_cli):
+    log, _ = fake_cli
+    ftw.classify("alpha")
+    ftw._CLI_PROC.kill()
+    ftw._CLI_PROC.wait()
+    assert ftw.classify("beta")["predicted_category"] == "beta"
+    assert len(starts(log)) == 2
+
+
+def test_retry_when_worker_dies_mid_request(fake_cli):
+    log, die = fake_cli
+    ftw.classify("alpha")
+    die.touch()
+    assert ftw.classify("beta")["predicted_category"] == "beta"
+    assert len(starts(log)) == 2
+
+
+def test_second_failure_raises(fake_cli, monkeypatch):
+    _, die = fake_cli
+    original = ftw._start_cli
+
+    def start_and_arm():
+        # every restarted worker dies on its first request too
+        original()
+        die.touch()
+
+    ftw.classify("alpha")
+    die.touch()
+    monkeypatch.setattr(ftw, "_start_cli", start_and_arm)
+    with pytest.raises(RuntimeError):
+        ftw.classify("beta")
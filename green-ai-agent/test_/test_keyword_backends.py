@@ -0,0 +1,96 @@
+"""Every keyword backend must count like the original `sum(w in t)` scan."""
+import random
+
+import numpy as np
+import pytest
+
+import backend.agent_logic as agent_logic
+
+BACKENDS = ["hyperscan", "ahocorasick", "unrolled"]
+
+# "update" and "help" listed under two categories, to cover shared keywords
+SHARED_KEYWORDS = dict(agent_logic.KEYWORDS, support=agent_logic.KEYWORDS["support"] + ["update", "help"])
+
+
+def reference_counts(keywords, t):
+    counts = [0] * agent_logic.NUM_CLASSES
+    for cat, words in keywords.items():
+        counts[agent_logic.CAT_INDEX[cat]] = sum(1 for w in words if w in t)
+    return counts
+
+
+def sample_texts(keywords, n=2000, seed=5):
+    words = sorted({w for ws in keywords.values() for w in ws}) + [" ", "x", "news", "Click Here", "HELP"]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 10))) for _ in range(n)]
+
+
+@pytest.fixture(params=[None, SHARED_KEYWORDS], ids=["keywords", "shared-keywords"])
+def keywords(request, swap_keywords):
+    """Rebuild every matcher from the given keyword bank (None keeps the module's own)."""
+    if request.param is not None:
+        swap_keywords(request.param)
+    return agent_logic.KEYWORDS
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, keywords, monkeypatch):
+    """Force _keyword_counts onto one backend; caches are cleared so no result leaks across backends."""
+    name = request.param
+    if name == "hyperscan" and not agent_logic.HAS_HYPERSCAN:
+        pytest.skip("hyperscan not installed")
+    if name == "ahocorasick" and not agent_logic.HAS_AHOCORASICK:
+        pytest.skip("pyahocorasick not installed")
+    if name != "hyperscan":
+        monkeypatch.setattr(agent_logic, "_HS_DB", None)
+    if name == "unrolled":
+        monkeypatch.setattr(agent_logic, "_AUTOMATON", None)
+    agent_logic._text_counts.cache_clear()
+    agent_logic._classify_core.cache_clear()
+    yield name
+    agent_logic._text_counts.cache_clear()
+    agent_logic._classify_core.cache_clear()
+
+
+def test_counts_match_reference(backend, keywords):
+    for text in sample_texts(keywords):
+        t = text.lower()
+        assert list(agent_logic._keyword_counts(t)) == reference_counts(keywords, t), text
+
+
+def test_batch_matches_single(backend, keywords):
+    texts = sample_texts(keywords, n=500, seed=7)
+    agent = agent_logic.IntelligentEmailAgent()
+    single = [agent.classify_email(t) for t in texts]
+    agent_logic._classify_core.cache_clear()
+    batch = agent.classify_batch(texts)
+    for s, b in zip(single, batch):
+        s.pop("timestamp")
+        b.pop("timestamp")
+    assert batch == single
+
+
+def test_every_keyword_of_one_category(backend, keywords):
+    # the most hits one category can get alone, i.e. the largest keys of the trivial table
+    agent = agent_logic.IntelligentEmailAgent()
+    for cat, words in keywords.items():
+        idx = agent_logic.CAT_INDEX[cat]
+        text = " ".join(w for w in words if set(agent_logic._KW_CATS[w]) == {idx})
+        assert agent.classify_email(text)["predicted_category"] == cat
+        assert agent.classify_batch([text])[0]["predicted_category"] == cat
+
+
+def test_trivial_cores_match_scoring(keywords):
+    expected = {None: agent_logic._core_from_counts(np.zeros(agent_logic.NUM_CLASSES, dtype=np.int32))}
+    for cat, words in keywords.items():
+        idx = agent_logic.CAT_INDEX[cat]
+        for hits in range(1, len(words) + 1):
+            counts = np.zeros(agent_logic.NUM_CLASSES, dtype=np.int32)
+            counts[idx] = hits
+            expected[(idx, hits)] = agent_logic._core_from_counts(counts)
+    assert agent_logic._TRIVIAL_CORES == expected
+
+
+def test_batch_rejects_mismatched_preferences():
+    with pytest.raises(ValueError):
+        agent_logic.IntelligentEmailAgent().classify_batch(["a", "b"], preferences=[None])
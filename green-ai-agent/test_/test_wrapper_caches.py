@@ -0,0 +1,123 @@
+"""LFU read-through caches in the sklearn and fasttext wrappers, with stub models."""
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+import backend.fasttext_wrapper as ftw
+import backend.sklearn_wrapper as skw
+
+pytestmark = pytest.mark.skipif(not skw.HAS_CACHETOOLS, reason="cachetools not installed")
+
+
+class StubPipeline:
+    """joblib-loaded stand-in: vectorizer + classifier steps, counting predict_proba calls."""
+
+    def __init__(self):
+        clf = type("Clf", (), {"classes_": np.array(["work", "spam", "personal"])})()
+        self.steps = [("tfidf", None), ("clf", clf)]
+        self.calls = 0
+
+    def predict_proba(self, texts):
+        self.calls += 1
+        return np.array([[0.2, 0.7, 0.1]])
+
+
+class StubFastText:
+    """fasttext model stand-in, counting predict calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, text, k=3):
+        self.calls.append((text, k))
+        return ("__label__work", "__label__spam", "__label__personal")[:k], (0.6, 0.3, 0.1)[:k]
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    ticks = itertools.count(1000.0)
+    monkeypatch.setattr(time, "time", lambda: next(ticks))
+
+
+@pytest.fixture
+def sklearn_model(tmp_path, monkeypatch):
+    """Load a StubPipeline; yields every stub loaded so far, newest last."""
+    path = tmp_path / "model.joblib"
+    path.touch()
+    models = []
+
+    def load(p, *args, **kwargs):
+        models.append(StubPipeline())
+        return models[-1]
+
+    monkeypatch.setattr(skw.joblib, "load", load)
+    skw.load_model(str(path))
+    yield models
+    monkeypatch.setattr(skw, "MODEL", None)
+    skw._CACHE.clear()
+
+
+@pytest.fixture
+def fasttext_model(monkeypatch):
+    model = StubFastText()
+    stub_module = type("fasttext", (), {"load_model": staticmethod(lambda path: model)})
+    monkeypatch.setattr(ftw, "fasttext", stub_module, raising=False)
+    monkeypatch.setattr(ftw, "HAS_PY_FASTTEXT", True)
+    ftw.load_model("model.bin")
+    yield model
+    monkeypatch.setattr(ftw, "MODEL", None)
+    monkeypatch.setattr(ftw, "MODEL_PATH", None)
+    ftw._CACHE.clear()
+
+
+def test_sklearn_hit_skips_predict_proba(sklearn_model):
+    models = sklearn_model
+    first = skw.classify("quarterly report")
+    second = skw.classify("quarterly report")
+    assert models[-1].calls == 1
+    assert second["all_predictions"] == first["all_predictions"]
+    assert second["predicted_category"] == "spam"
+    skw.classify("something else")
+    assert models[-1].calls == 2
+
+
+def test_sklearn_load_model_clears_cache(sklearn_model):
+    models = sklearn_model
+    skw.classify("quarterly report")
+    assert len(skw._CACHE) == 1
+    skw.load_model(skw.MODEL_PATH)
+    assert len(skw._CACHE) == 0
+    skw.classify("quarterly report")
+    assert models[-1].calls == 1
+
+
+def test_sklearn_hit_gets_fresh_timestamp(sklearn_model, fake_clock):
+    first = skw.classify("quarterly report")
+    second = skw.classify("quarterly report")
+    assert second["timestamp"] > first["timestamp"]
+
+
+def test_fasttext_keyed_by_text_hash_and_k(fasttext_model):
+    ftw.classify("quarterly report", k=3)
+    ftw.classify("quarterly report", k=3)
+    ftw.classify("quarterly report", k=1)
+    assert fasttext_model.calls == [("quarterly report", 3), ("quarterly report", 1)]
+    assert set(ftw._CACHE) == {(hash("quarterly report"), 3), (hash("quarterly report"), 1)}
+    assert len(ftw.classify("quarterly report", k=1)["all_predictions"]) == 1
+
+
+def test_fasttext_load_model_clears_cache(fasttext_model):
+    ftw.classify("quarterly report")
+    ftw.load_model("model.bin")
+    assert len(ftw._CACHE) == 0
+    ftw.classify("quarterly report")
+    assert len(fasttext_model.calls) == 2
+
+
+def test_fasttext_hit_gets_fresh_timestamp(fasttext_model, fake_clock):
+    first = ftw.classify("quarterly report")
+    second = ftw.classify("quarterly report")
+    assert len(fasttext_model.calls) == 1
+    assert second["timestamp"] > first["timestamp"]